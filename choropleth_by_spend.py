@@ -1,55 +1,61 @@
 """Generate an interactive ZIP code choropleth from zipped data sources."""
 
 import argparse
+import io
 import os
+import shutil
 import zipfile
-import tempfile
-from urllib.parse import urlparse
+from pathlib import Path
+from typing import BinaryIO, Union
 
+import numpy as np
 import pandas as pd
 import geopandas as gpd
+import shapely
 import folium
 import requests
 
+# Copy HTTP downloads in 256 KiB blocks to keep per-chunk overhead low.
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
 
-def read_zipped_shapefile(zip_path: str) -> gpd.GeoDataFrame:
-    """Extract and read the first shapefile found in a zip archive."""
-    with zipfile.ZipFile(
-        zip_path, "r"
-    ) as zf, tempfile.TemporaryDirectory() as tmpdir:
-        zf.extractall(tmpdir)
-        shp_files = []
-        for root, _, files in os.walk(tmpdir):
-            for f in files:
-                if f.endswith(".shp"):
-                    shp_files.append(os.path.join(root, f))
-        if not shp_files:
-            raise FileNotFoundError("No .shp file found in geometry zip")
-        return gpd.read_file(shp_files[0])
+
+def read_zipped_shapefile(zip_path: Union[str, BinaryIO]) -> gpd.GeoDataFrame:
+    """Read the first shapefile found in a zip archive without extracting."""
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        shp_files = [f for f in zf.namelist() if f.endswith(".shp")]
+    if not shp_files:
+        raise FileNotFoundError("No .shp file found in geometry zip")
+    if isinstance(zip_path, str):
+        # GDAL reads the archive member in place through /vsizip/
+        source = f"/vsizip/{os.path.abspath(zip_path)}/{shp_files[0]}"
+        return gpd.read_file(source, engine="pyogrio")
+    # In-memory archives are opened whole, so select the layer by name
+    zip_path.seek(0)
+    return gpd.read_file(
+        zip_path, engine="pyogrio", layer=Path(shp_files[0]).stem
+    )
 
 
-def read_zipped_csv(zip_path: str) -> pd.DataFrame:
+def read_zipped_csv(zip_path: Union[str, BinaryIO]) -> pd.DataFrame:
     """Read the first CSV file found in a zip archive."""
     with zipfile.ZipFile(zip_path, "r") as zf:
         csv_files = [f for f in zf.namelist() if f.endswith(".csv")]
         if not csv_files:
             raise FileNotFoundError("No .csv file found in data zip")
         with zf.open(csv_files[0]) as f:
-            return pd.read_csv(f)
+            return pd.read_csv(f, engine="pyarrow")
 
 
-def download_if_url(path: str) -> str:
-    """Return local path, downloading if given an HTTP URL."""
+def download_if_url(path: str) -> Union[str, BinaryIO]:
+    """Return local path, or an in-memory copy if given an HTTP URL."""
     if path.startswith("http://") or path.startswith("https://"):
         response = requests.get(path, stream=True)
         response.raise_for_status()
-        tmp = tempfile.NamedTemporaryFile(
-            delete=False, suffix=os.path.splitext(urlparse(path).path)[1]
-        )
-        for chunk in response.iter_content(chunk_size=8192):
-            tmp.write(chunk)
-        tmp.close()
-        return tmp.name
+        response.raw.decode_content = True
+        buf = io.BytesIO()
+        shutil.copyfileobj(response.raw, buf, length=DOWNLOAD_CHUNK_SIZE)
+        buf.seek(0)
+        return buf
     return path
 
 
@@ -90,8 +96,11 @@ def main():
     gdf = read_zipped_shapefile(geometry_zip_path)
     df = read_zipped_csv(data_zip_path)
 
-    gdf[args.geometry_zip_field] = gdf[args.geometry_zip_field].astype(str)
-    df[args.data_zip_field] = df[args.data_zip_field].astype(str)
+    # Compare keys as typed strings rather than Python objects.
+    gdf[args.geometry_zip_field] = gdf[args.geometry_zip_field].astype(
+        "string"
+    )
+    df[args.data_zip_field] = df[args.data_zip_field].astype("string")
 
     merged = gdf.merge(
         df,
@@ -100,10 +109,13 @@ def main():
         how="left",
     )
 
+    # Work on the raw shapely array to skip building an intermediate
+    # GeoSeries of centroids.
+    centroids = shapely.centroid(np.asarray(merged.geometry.values))
     m = folium.Map(
         location=[
-            merged.geometry.centroid.y.mean(),
-            merged.geometry.centroid.x.mean(),
+            shapely.get_y(centroids).mean(),
+            shapely.get_x(centroids).mean(),
         ],
         zoom_start=5,
     )
@@ -122,7 +134,7 @@ def main():
     ).add_to(m)
 
     if args.states:
-        states = gpd.read_file(args.states)
+        states = gpd.read_file(args.states, engine="pyogrio")
         folium.GeoJson(
             states,
             name="States",
@@ -136,11 +148,6 @@ def main():
     m.save(args.output_html)
     print(f"Saved choropleth map to {args.output_html}")
 
-    if geometry_zip_path != args.geometry_zip:
-        os.unlink(geometry_zip_path)
-    if data_zip_path != args.data_zip:
-        os.unlink(data_zip_path)
-
 
 if __name__ == "__main__":
     main()
@@ -3,19 +3,30 @@
 from __future__ import annotations
 
 import argparse
-import json
+import multiprocessing
 import os
 import re
 import shutil
 import tempfile
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional
 
+import orjson
 import pandas as pd
 import requests
 
+# Copy HTTP downloads in 256 KiB blocks to keep per-chunk overhead low.
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Columns used as flow magnitude, in order of preference.
+FLOW_MAGNITUDE_FIELDS = ("spend", "visits", "impressions")
+
+# Separators allowed between ZIP codes in a single cell.
+_ZIP_SPLIT = re.compile(r"[;,\s]+")
+
 
 ###############################
 # File download and extraction
@@ -29,9 +40,9 @@ def download_file(url_or_path: str) -> Path:
         resp = requests.get(url_or_path, stream=True, timeout=30)
         resp.raise_for_status()
         fd, tmp_path = tempfile.mkstemp(suffix=path.suffix)
+        resp.raw.decode_content = True
         with os.fdopen(fd, "wb") as f:
-            for chunk in resp.iter_content(chunk_size=8192):
-                f.write(chunk)
+            shutil.copyfileobj(resp.raw, f, length=DOWNLOAD_CHUNK_SIZE)
         return Path(tmp_path)
     return path
 
@@ -87,14 +98,15 @@ def normalize_numeric(
     df: pd.DataFrame, columns: Iterable[str]
 ) -> pd.DataFrame:
     """Apply min-max scaling to specified numeric columns."""
-    for col in columns:
-        if col in df.columns:
-            min_val = df[col].min()
-            max_val = df[col].max()
-            if pd.notna(min_val) and pd.notna(max_val) and max_val != min_val:
-                df[col] = (df[col] - min_val) / (max_val - min_val)
-            else:
-                df[col] = 0
+    cols = [c for c in columns if c in df.columns]
+    if not cols:
+        return df
+    stats = df[cols].agg(["min", "max"])
+    span = stats.loc["max"] - stats.loc["min"]
+    scaled = (df[cols] - stats.loc["min"]) / span.where(span != 0)
+    # Constant or all-missing columns carry no signal
+    scaled.loc[:, span.isna() | (span == 0)] = 0
+    df[cols] = scaled
     return df
 
 
@@ -102,24 +114,16 @@ def expand_zip_list(zip_field: str, df: pd.DataFrame) -> pd.DataFrame:
     """Expand rows where `zip_field` contains comma-separated ZIP codes."""
     if zip_field not in df.columns:
         return df
-    rows = []
-    for _, row in df.iterrows():
-        zips = re.split(r"[;,\s]+", str(row[zip_field]))
-        for z in zips:
-            z = z.strip()
-            if not z:
-                continue
-            new_row = row.copy()
-            new_row[zip_field] = z
-            rows.append(new_row)
-    return pd.DataFrame(rows)
+    zips = df[zip_field].astype(str).str.split(_ZIP_SPLIT)
+    df = df.assign(**{zip_field: zips}).explode(zip_field, ignore_index=True)
+    df[zip_field] = df[zip_field].str.strip()
+    return df[df[zip_field].str.len() > 0].reset_index(drop=True)
 
 
-def aggregate_by_geo(df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate numeric metrics by ZIP and DMA."""
-    df = df.copy()
-    # Normalize column names
-    df.columns = [c.lower() for c in df.columns]
+def prepare_geo_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """Return normalized numeric metrics per row, keyed by ZIP and DMA."""
+    # Normalize column names without copying the data
+    df = df.rename(columns={c: c.lower() for c in df.columns}, copy=False)
     zip_col = None
     for c in df.columns:
         if "zip" in c:
@@ -134,6 +138,10 @@ def aggregate_by_geo(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
 
     df = expand_zip_list(zip_col, df)
+    # Categorical keys group on integer codes instead of hashing strings
+    df[zip_col] = df[zip_col].astype("category")
+    if dma_col:
+        df[dma_col] = df[dma_col].astype("category")
 
     numeric_cols = [c for c in df.columns if df[c].dtype.kind in "if"]
     df = normalize_numeric(df, numeric_cols)
@@ -141,94 +149,175 @@ def aggregate_by_geo(df: pd.DataFrame) -> pd.DataFrame:
     group_cols = [zip_col]
     if dma_col:
         group_cols.append(dma_col)
-    aggregated = df.groupby(group_cols)[numeric_cols].sum().reset_index()
-    aggregated.rename(
-        columns={zip_col: "ZIP", dma_col or "dma": "DMA"}, inplace=True
+    return df[group_cols + numeric_cols].rename(
+        columns={zip_col: "ZIP", dma_col or "dma": "DMA"}
     )
-    return aggregated
 
 
-def build_flow_records(
-    df: pd.DataFrame, zip_latlon: pd.DataFrame
-) -> List[Dict]:
-    """Create flow features from origin/destination columns if available."""
-    df = df.copy()
-    df.columns = [c.lower() for c in df.columns]
-    if "origin" not in df.columns:
-        return []
-    origin_col = "origin"
+def aggregate_by_geo(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate numeric metrics by ZIP and DMA."""
+    metrics = prepare_geo_metrics(df)
+    if metrics.empty:
+        return metrics
+    group_cols = [c for c in ("ZIP", "DMA") if c in metrics.columns]
+    return metrics.groupby(group_cols, observed=True).sum().reset_index()
+
+
+def align_categories(
+    frames: List[pd.DataFrame], columns: Iterable[str]
+) -> None:
+    """Give categorical `columns` the same categories across `frames`.
+
+    Concatenating categoricals only keeps the dtype when the categories
+    match, so this keeps the combined keys categorical.
+    """
+    for col in columns:
+        categories = None
+        for f in frames:
+            if col in f.columns:
+                cats = f[col].cat.categories
+                categories = (
+                    cats if categories is None else categories.union(cats)
+                )
+        for f in frames:
+            if col in f.columns:
+                f[col] = f[col].cat.set_categories(categories)
+
+
+def load_zip_coordinates(path: str) -> pd.DataFrame:
+    """Load a ZIP latitude/longitude CSV as a ZIP-indexed lookup."""
+    zip_latlon = pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+    zip_latlon["ZIP"] = (
+        zip_latlon[zip_latlon.columns[0]].astype(str).str.zfill(5)
+    )
+    if (
+        "latitude" not in zip_latlon.columns
+        or "longitude" not in zip_latlon.columns
+    ):
+        # Some datasets use LAT and LNG column names
+        if {"LAT", "LNG"}.issubset(zip_latlon.columns):
+            zip_latlon.rename(
+                columns={"LAT": "latitude", "LNG": "longitude"}, inplace=True
+            )
+    return index_zip_coordinates(zip_latlon)
+
+
+def index_zip_coordinates(zip_latlon: pd.DataFrame) -> pd.DataFrame:
+    """Return a ZIP-indexed latitude/longitude lookup with one row per ZIP."""
+    return (
+        zip_latlon.drop_duplicates("ZIP")
+        .set_index("ZIP")[["latitude", "longitude"]]
+        .dropna()
+    )
+
+
+def select_flow_columns(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Return origin, destination and magnitude columns for flow mapping.
+
+    Column names are lower-cased and the destination column is renamed to
+    ``destination_zip`` so frames from different files can be concatenated.
+    Returns None if the frame has no origin/destination pair.
+    """
+    columns = [c.lower() for c in df.columns]
+    if "origin" not in columns:
+        return None
     dest_col = None
-    for c in df.columns:
+    for c in columns:
         if "destination" in c and "zip" in c:
             dest_col = c
             break
     if not dest_col:
+        return None
+    keep = ["origin", dest_col]
+    for field in FLOW_MAGNITUDE_FIELDS:
+        if field in columns:
+            keep.append(field)
+            break
+    df = df.rename(columns=dict(zip(df.columns, columns)), copy=False)
+    return df[keep].rename(columns={dest_col: "destination_zip"})
+
+
+def build_flow_records(
+    df: pd.DataFrame, zip_coords: pd.DataFrame
+) -> List[Dict]:
+    """Create flow features from origin/destination columns if available.
+
+    `zip_coords` is the lookup returned by `index_zip_coordinates`.
+    """
+    df = select_flow_columns(df)
+    if df is None:
         return []
-    df = expand_zip_list(dest_col, df)
+    df = expand_zip_list("destination_zip", df)
+
+    df["ozip"] = df["origin"].astype(str).str.zfill(5)
+    df["dzip"] = df["destination_zip"].astype(str).str.zfill(5)
+    df = df.merge(
+        zip_coords.add_prefix("o_"), left_on="ozip", right_index=True
+    ).merge(zip_coords.add_prefix("d_"), left_on="dzip", right_index=True)
+
+    # Attach magnitude if present
+    field = next((f for f in FLOW_MAGNITUDE_FIELDS if f in df.columns), None)
+    magnitudes = df[field].tolist() if field else [None] * len(df)
 
     flows = []
-    for _, row in df.iterrows():
-        ozip = str(row[origin_col]).zfill(5)
-        dzip = str(row[dest_col]).zfill(5)
-        orec = zip_latlon[zip_latlon["ZIP"] == ozip]
-        drec = zip_latlon[zip_latlon["ZIP"] == dzip]
-        if orec.empty or drec.empty:
-            continue
-        flow = {
-            "type": "Feature",
-            "geometry": {
-                "type": "LineString",
-                "coordinates": [
-                    [
-                        float(orec.iloc[0]["longitude"]),
-                        float(orec.iloc[0]["latitude"]),
-                    ],
-                    [
-                        float(drec.iloc[0]["longitude"]),
-                        float(drec.iloc[0]["latitude"]),
-                    ],
-                ],
-            },
-            "properties": {
-                "origin_zip": ozip,
-                "dest_zip": dzip,
-            },
-        }
-        # Attach magnitude if present
-        for field in ("spend", "visits", "impressions"):
-            if field in df.columns:
-                flow["properties"][field] = row[field]
-                flow["properties"]["magnitude"] = row[field]
-                break
-        flows.append(flow)
+    for olon, olat, dlon, dlat, ozip, dzip, mag in zip(
+        df["o_longitude"].tolist(),
+        df["o_latitude"].tolist(),
+        df["d_longitude"].tolist(),
+        df["d_latitude"].tolist(),
+        df["ozip"].tolist(),
+        df["dzip"].tolist(),
+        magnitudes,
+    ):
+        properties = {"origin_zip": ozip, "dest_zip": dzip}
+        if field:
+            properties[field] = mag
+            properties["magnitude"] = mag
+        flows.append(
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "LineString",
+                    "coordinates": [[olon, olat], [dlon, dlat]],
+                },
+                "properties": properties,
+            }
+        )
     return flows
 
 
 def create_heatmap_features(
-    df: pd.DataFrame, zip_latlon: pd.DataFrame
+    df: pd.DataFrame, zip_coords: pd.DataFrame
 ) -> List[Dict]:
-    """Convert aggregated ZIP data to GeoJSON point features."""
+    """Convert aggregated ZIP data to GeoJSON point features.
+
+    `zip_coords` is the lookup returned by `index_zip_coordinates`.
+    """
+    # Private names keep the lookup apart from any latitude/longitude
+    # metric columns the input carries as properties.
+    coords = zip_coords.rename(
+        columns={"latitude": "_point_lat", "longitude": "_point_lon"}
+    )
+    merged = df.assign(ZIP=df["ZIP"].astype(str).str.zfill(5)).join(
+        coords, on="ZIP", how="inner"
+    )
+    lons = merged["_point_lon"].tolist()
+    lats = merged["_point_lat"].tolist()
+    records = merged.drop(columns=["_point_lat", "_point_lon"]).to_dict(
+        orient="records"
+    )
+
     features = []
-    for _, row in df.iterrows():
-        zip_code = str(row["ZIP"]).zfill(5)
-        rec = zip_latlon[zip_latlon["ZIP"] == zip_code]
-        if rec.empty:
-            continue
-        props = row.to_dict()
-        feat = {
-            "type": "Feature",
-            "geometry": {
-                "type": "Point",
-                "coordinates": [
-                    float(rec.iloc[0]["longitude"]),
-                    float(rec.iloc[0]["latitude"]),
-                ],
-            },
-            "properties": props,
-        }
+    for lon, lat, props in zip(lons, lats, records):
         if "spend" in props:
-            feat["properties"]["value"] = props["spend"]
-        features.append(feat)
+            props["value"] = props["spend"]
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": props,
+            }
+        )
     return features
 
 
@@ -376,44 +465,61 @@ def main() -> None:
     with extract_zip(zip1) as files1, extract_zip(zip2) as files2:
         datasets = load_spreadsheets(files1 + files2)
 
-    aggregated_parts = []
-    flows_parts = []
-
-    zip_latlon = pd.read_csv(args.zip_latlon)
-    zip_latlon["ZIP"] = (
-        zip_latlon[zip_latlon.columns[0]].astype(str).str.zfill(5)
+    # Datasets are independent, so aggregate each one in a worker process
+    # while the coordinate CSV is loaded. Only the per-dataset ZIP/DMA sums
+    # travel back to this process.
+    start_method = (
+        "forkserver"
+        if "forkserver" in multiprocessing.get_all_start_methods()
+        else None
     )
-    if (
-        "latitude" not in zip_latlon.columns
-        or "longitude" not in zip_latlon.columns
-    ):
-        # Some datasets use LAT and LNG column names
-        if {"LAT", "LNG"}.issubset(zip_latlon.columns):
-            zip_latlon.rename(
-                columns={"LAT": "latitude", "LNG": "longitude"}, inplace=True
-            )
-
+    with ProcessPoolExecutor(
+        mp_context=multiprocessing.get_context(start_method)
+    ) as pool:
+        agg_futures = [
+            pool.submit(aggregate_by_geo, df) for df in datasets.values()
+        ]
+        zip_coords = load_zip_coordinates(args.zip_latlon)
+        agg_parts = [f.result() for f in agg_futures]
+
+    # Flow frames grouped by schema so each group is joined only once
+    flow_frames: Dict[tuple, List[pd.DataFrame]] = {}
     for df in datasets.values():
-        agg = aggregate_by_geo(df)
-        if not agg.empty:
-            aggregated_parts.append(agg)
-        flows = build_flow_records(df, zip_latlon)
-        flows_parts.extend(flows)
+        flow_df = select_flow_columns(df)
+        if flow_df is not None:
+            flow_frames.setdefault(tuple(flow_df.columns), []).append(flow_df)
 
-    if not aggregated_parts:
+    agg_parts = [a for a in agg_parts if not a.empty]
+    if not agg_parts:
         raise RuntimeError("No ZIP-level data found in provided files")
 
-    aggregated = pd.concat(aggregated_parts, ignore_index=True)
-    aggregated = aggregated.groupby(["ZIP", "DMA"], as_index=False).sum()
+    # Sums are associative, so combining the per-dataset sums with one more
+    # groupby gives the same totals as grouping all rows at once.
+    align_categories(agg_parts, ["ZIP", "DMA"])
+    aggregated = (
+        pd.concat(agg_parts, ignore_index=True)
+        .groupby(["ZIP", "DMA"], sort=False, observed=True)
+        .sum()
+        .reset_index()
+    )
 
-    heat_features = create_heatmap_features(aggregated, zip_latlon)
+    heat_features = create_heatmap_features(aggregated, zip_coords)
     heat_json = {"type": "FeatureCollection", "features": heat_features}
-    with open("zip_heatmap.json", "w", encoding="utf-8") as f:
-        json.dump(heat_json, f)
+    Path("zip_heatmap.json").write_bytes(
+        orjson.dumps(heat_json, option=orjson.OPT_SERIALIZE_NUMPY)
+    )
 
+    flows_parts = []
+    for frames in flow_frames.values():
+        flows_parts.extend(
+            build_flow_records(
+                pd.concat(frames, ignore_index=True), zip_coords
+            )
+        )
     flow_json = {"type": "FeatureCollection", "features": flows_parts}
-    with open("flows.json", "w", encoding="utf-8") as f:
-        json.dump(flow_json, f)
+    Path("flows.json").write_bytes(
+        orjson.dumps(flow_json, option=orjson.OPT_SERIALIZE_NUMPY)
+    )
 
     html = HTML_TEMPLATE.format(token=token)
     Path(args.output_html).write_text(html, encoding="utf-8")
@@ -1,12 +1,19 @@
 """Dash application for interactive exploration."""
 
+import functools
+
 import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash import Patch, dcc, html
+from dash.dependencies import Input, Output, State
 import pandas as pd
 import plotly.graph_objects as go
 
-from .visualization import choropleth_heatmap, scatter_plot
+from .visualization import choropleth_heatmap, geo_center, scatter_plot
+
+
+def _patchable(fig: go.Figure) -> bool:
+    """Whether a choropleth is a single continuous trace (patchable `z`)."""
+    return len(fig.data) == 1 and fig.data[0].z is not None
 
 
 class ReportingDashboard:
@@ -16,7 +23,16 @@ class ReportingDashboard:
         self.df = df
         self.geo = geo
         self.geo_key = geo_key
-        self.app = dash.Dash(__name__)
+        # The geometries never change, so derive the map center and geojson
+        # payload once rather than on every figure build.
+        self._center = geo_center(geo)
+        self._geojson = geo.__geo_interface__
+        # The data is fixed for the life of the app, so figures only depend
+        # on the selected column and can be reused when it is re-selected.
+        # The cache lives on the instance so it is freed with the dashboard.
+        self._build_figures = functools.lru_cache(maxsize=32)(self._figures)
+        # Figures carry the full geojson, so gzip responses on the way out.
+        self.app = dash.Dash(__name__, compress=True)
         self._setup_layout()
         self._register_callbacks()
 
@@ -28,29 +44,61 @@ class ReportingDashboard:
             else []
         )
         value = demographics[0] if demographics else None
+        fig_map, fig_scatter = (
+            self._build_figures(value) if value else (go.Figure(), go.Figure())
+        )
 
+        # The choropleth (and its geojson) is sent once with the layout;
+        # callbacks only patch the per-column trace values afterwards while
+        # the map stays a single continuous trace.
         self.app.layout = html.Div(
             [
                 dcc.Dropdown(id="demo-dropdown", options=options, value=value),
-                dcc.Graph(id="choropleth"),
-                dcc.Graph(id="scatter"),
+                dcc.Graph(id="choropleth", figure=fig_map),
+                dcc.Graph(id="scatter", figure=fig_scatter),
+                dcc.Store(id="choropleth-patchable", data=_patchable(fig_map)),
             ]
         )
 
+    def _figures(self, demo_col):
+        fig_map = choropleth_heatmap(
+            self.df,
+            self.geo,
+            demo_col,
+            self.geo_key,
+            center=self._center,
+            geojson=self._geojson,
+        )
+        fig_scatter = scatter_plot(self.df, "spend", demo_col)
+        return fig_map, fig_scatter
+
     def _register_callbacks(self):
         @self.app.callback(
-            [Output("choropleth", "figure"), Output("scatter", "figure")],
+            [
+                Output("choropleth", "figure"),
+                Output("scatter", "figure"),
+                Output("choropleth-patchable", "data"),
+            ],
             [Input("demo-dropdown", "value")],
+            [State("choropleth-patchable", "data")],
+            prevent_initial_call=True,
         )
-        def update_plots(demo_col):
+        def update_plots(demo_col, shown_patchable):
             if not demo_col:
-                return go.Figure(), go.Figure()
-
-            fig_map = choropleth_heatmap(
-                self.df, self.geo, demo_col, self.geo_key
-            )
-            fig_scatter = scatter_plot(self.df, "spend", demo_col)
-            return fig_map, fig_scatter
+                return go.Figure(), go.Figure(), False
+            fig_map, fig_scatter = self._build_figures(demo_col)
+            patchable = _patchable(fig_map)
+            if not (patchable and shown_patchable):
+                # Discrete color maps have one trace per category, so the
+                # shown figure cannot be patched into the new one.
+                return fig_map, fig_scatter, patchable
+            trace = fig_map.data[0]
+            coloraxis = fig_map.layout.coloraxis.to_plotly_json()
+            patch = Patch()
+            patch["data"][0]["z"] = trace.z
+            patch["data"][0]["hovertemplate"] = trace.hovertemplate
+            patch["layout"]["coloraxis"] = coloraxis
+            return patch, fig_scatter, True
 
     def run(self, **kwargs):
         self.app.run_server(**kwargs)
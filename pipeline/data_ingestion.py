@@ -1,27 +1,132 @@
 """Data ingestion utilities for heterogeneous sources."""
 
+import functools
+import hashlib
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List
 
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 
+# Geographic keys are kept as text so ZIP codes keep their leading zeros.
+KEY_COLUMN_TYPES = {
+    "ZIP": pa.string(),
+    "DMA": pa.string(),
+    "STATE": pa.string(),
+}
 
+# Cells pyarrow should read as missing, matching pandas.read_csv's defaults.
+NULL_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+# Parsed datasets are cached here as Parquet, keyed on path, mtime and size.
+CACHE_DIR = Path(
+    os.environ.get("MAPS_CACHE_DIR", Path.home() / ".cache" / "maps")
+)
+# Part of every cache key. Bump it whenever parsing changes (read options,
+# KEY_COLUMN_TYPES, ...) so snapshots written by older loaders are ignored.
+CACHE_VERSION = 2
+
+
+def parquet_cached(
+    loader: Callable[[str], pd.DataFrame]
+) -> Callable[[str], pd.DataFrame]:
+    """Cache a path-based loader's result as a Parquet snapshot.
+
+    The cache key changes whenever the source file is modified or
+    `CACHE_VERSION` is bumped, so stale snapshots are never read. Frames
+    that cannot be written as Parquet are returned uncached.
+    """
+
+    @functools.wraps(loader)
+    def wrapper(path: str) -> pd.DataFrame:
+        file_path = Path(path)
+        if not file_path.exists():
+            return loader(path)
+        stat = file_path.stat()
+        key = hashlib.sha1(
+            f"{CACHE_VERSION}|{loader.__qualname__}|{file_path.resolve()}|"
+            f"{stat.st_mtime_ns}|{stat.st_size}".encode()
+        ).hexdigest()
+        cache_file = CACHE_DIR / f"{key}.parquet"
+        if cache_file.exists():
+            return pd.read_parquet(cache_file)
+        df = loader(path)
+        # Write under a unique name and rename so readers never see a
+        # partial file.
+        tmp_file = CACHE_DIR / f"{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(tmp_file, compression="zstd")
+            tmp_file.replace(cache_file)
+        except (OSError, ValueError, pa.ArrowException):
+            tmp_file.unlink(missing_ok=True)
+        return df
+
+    return wrapper
+
+
+def read_csv(path: Path) -> pd.DataFrame:
+    """Read a CSV with pyarrow's multi-threaded block parser."""
+    table = pacsv.read_csv(
+        str(path),
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=16 << 20),
+        convert_options=pacsv.ConvertOptions(
+            column_types=KEY_COLUMN_TYPES,
+            null_values=NULL_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    # Text stays Arrow-backed; numeric columns convert to NumPy zero-copy.
+    return table.to_pandas(
+        types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get
+    )
+
+
+@parquet_cached
 def load_dataset(path: str) -> pd.DataFrame:
     """Load a dataset from CSV or Excel based on file extension."""
     file_path = Path(path)
     if not file_path.exists():
         raise FileNotFoundError(f"Dataset not found: {path}")
     if file_path.suffix.lower() in {".csv"}:
-        return pd.read_csv(file_path)
+        return read_csv(file_path)
     if file_path.suffix.lower() in {".xlsx", ".xls"}:
         return pd.read_excel(file_path)
     raise ValueError(f"Unsupported file type: {file_path.suffix}")
 
 
 def load_sources(sources: List[str]) -> Dict[str, pd.DataFrame]:
-    """Load multiple datasets and return them keyed by basename."""
-    data = {}
-    for src in sources:
-        df = load_dataset(src)
-        data[Path(src).stem] = df
-    return data
+    """Load multiple datasets and return them keyed by basename.
+
+    Files are read on a thread pool so I/O and parsing of different files
+    overlap.
+    """
+    if not sources:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(32, len(sources))) as pool:
+        frames = list(pool.map(load_dataset, sources))
+    return {Path(src).stem: df for src, df in zip(sources, frames)}
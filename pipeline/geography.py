@@ -1,18 +1,42 @@
 """Geographic utilities for mapping ZIP codes to DMAs and states."""
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def _pad_zip(values: pd.Series) -> pd.Series:
+    """Left-pad ZIP codes to five digits with Arrow's string kernel."""
+    padded = pc.utf8_lpad(
+        pa.array(values.astype("string")), width=5, padding="0"
+    )
+    return pd.Series(
+        pd.arrays.ArrowExtensionArray(padded),
+        index=values.index,
+        name=values.name,
+    )
 
 
 def load_zip_dma_mapping(path: str) -> pd.DataFrame:
-    """Load a ZIP-to-DMA mapping dataset."""
+    """Load a ZIP-to-DMA mapping dataset indexed by ZIP."""
     mapping = pd.read_csv(path, dtype={"ZIP": str, "DMA": str, "STATE": str})
-    return mapping
+    mapping["ZIP"] = _pad_zip(mapping["ZIP"])
+    if not mapping["ZIP"].is_unique:
+        raise ValueError(f"Duplicate ZIP codes in mapping: {path}")
+    return mapping.set_index("ZIP")
 
 
 def map_zip_to_dma(
     df: pd.DataFrame, zip_col: str, mapping: pd.DataFrame
 ) -> pd.DataFrame:
-    """Merge DMA and state information based on ZIP codes."""
-    df[zip_col] = df[zip_col].astype(str)
-    merged = df.merge(mapping, left_on=zip_col, right_on="ZIP", how="left")
-    return merged
+    """Attach DMA and state information based on ZIP codes.
+
+    `mapping` is the ZIP-indexed frame returned by `load_zip_dma_mapping`.
+    Each mapping column is looked up with `Series.map`, which avoids
+    building a full merge for what is a one-to-one lookup.
+    """
+    zips = _pad_zip(df[zip_col])
+    for col in mapping.columns:
+        df[col] = zips.map(mapping[col])
+    df[zip_col] = zips
+    return df
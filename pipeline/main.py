@@ -15,6 +15,7 @@ from .modeling import (
     detect_anomalies_autoencoder,
     detect_anomalies_iforest,
     detect_anomalies_dbscan,
+    pca_basis,
     train_xgboost,
     evaluate_classifier,
 )
@@ -37,14 +38,18 @@ def run_pipeline(
     visit_df = datasets.get("visits", pd.DataFrame())
 
     # Normalize numeric fields
-    numeric_cols = [c for c in spend_df.columns if spend_df[c].dtype != object]
+    numeric_cols = [
+        c
+        for c in spend_df.columns
+        if pd.api.types.is_numeric_dtype(spend_df[c])
+    ]
     spend_df = normalize_numeric(spend_df, numeric_cols)
 
     # Encode categorical features
     cat_cols = [
         c
         for c in spend_df.columns
-        if spend_df[c].dtype == object and c != "ZIP"
+        if pd.api.types.is_string_dtype(spend_df[c]) and c != "ZIP"
     ]
     spend_df = encode_categoricals(spend_df, cat_cols)
 
@@ -70,8 +75,9 @@ def run_pipeline(
         c for c in master.columns if c not in {"ZIP", "DMA", "STATE", "period"}
     ]
     master["ae_mse"] = detect_anomalies_autoencoder(master, feature_cols)
-    master["iforest"] = detect_anomalies_iforest(master, feature_cols)
-    master["dbscan"] = detect_anomalies_dbscan(master, feature_cols)
+    basis = pca_basis(master, feature_cols)
+    master["iforest"] = detect_anomalies_iforest(master, feature_cols, basis)
+    master["dbscan"] = detect_anomalies_dbscan(master, feature_cols, basis)
 
     # Example supervised model training if target available
     if "target" in master.columns:
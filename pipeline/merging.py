@@ -6,9 +6,20 @@ import pandas as pd
 
 
 def merge_on_keys(dfs: List[pd.DataFrame], keys: List[str]) -> pd.DataFrame:
-    """Iteratively merge dataframes on the specified keys."""
+    """Outer-join dataframes on the specified keys."""
     if not dfs:
         raise ValueError("No dataframes provided for merging")
+    if len(dfs) == 1:
+        return dfs[0]
+    frames = [df.set_index(keys) for df in dfs]
+    value_cols = [c for frame in frames for c in frame.columns]
+    if len(value_cols) == len(set(value_cols)) and all(
+        frame.index.is_unique for frame in frames
+    ):
+        # Align every frame on the shared key index in a single pass instead
+        # of rebuilding a hash table for each pairwise merge.
+        return pd.concat(frames, axis=1, join="outer").reset_index()
+    # Duplicate keys or overlapping columns need merge's semantics
     merged = dfs[0]
     for df in dfs[1:]:
         merged = merged.merge(df, on=keys, how="outer")
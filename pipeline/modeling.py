@@ -1,11 +1,13 @@
 """Machine learning models for anomaly detection and prediction."""
 
-from typing import List
+import itertools
+from typing import List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest
 from sklearn.cluster import DBSCAN
-from sklearn.model_selection import GridSearchCV
+from sklearn.decomposition import PCA
 from sklearn.metrics import classification_report
 from tensorflow import keras
 from tensorflow.keras import layers
@@ -13,21 +15,39 @@ import xgboost as xgb
 import lightgbm as lgb
 import catboost as cb
 
+# Rows scored per autoencoder forward pass.
+SCORE_CHUNK_ROWS = 262144
+
 
 # ---------------------------------------------------------------------------
 # Unsupervised models
 # ---------------------------------------------------------------------------
 
 
-def build_autoencoder(input_dim: int) -> keras.Model:
-    """Create a simple dense autoencoder."""
+def build_autoencoder(
+    input_dim: int, dtype: str = "mixed_bfloat16"
+) -> keras.Model:
+    """Create a simple dense autoencoder.
+
+    Hidden layers use the `dtype` policy (bfloat16 compute with float32
+    weights by default); the output layer stays float32 so reconstruction
+    errors are computed at full precision.
+    """
     input_layer = keras.Input(shape=(input_dim,))
-    encoded = layers.Dense(input_dim // 2, activation="relu")(input_layer)
-    encoded = layers.Dense(input_dim // 4, activation="relu")(encoded)
-    decoded = layers.Dense(input_dim // 2, activation="relu")(encoded)
-    decoded = layers.Dense(input_dim, activation="linear")(decoded)
+    encoded = layers.Dense(input_dim // 2, activation="relu", dtype=dtype)(
+        input_layer
+    )
+    encoded = layers.Dense(input_dim // 4, activation="relu", dtype=dtype)(
+        encoded
+    )
+    decoded = layers.Dense(input_dim // 2, activation="relu", dtype=dtype)(
+        encoded
+    )
+    decoded = layers.Dense(input_dim, activation="linear", dtype="float32")(
+        decoded
+    )
     autoencoder = keras.Model(inputs=input_layer, outputs=decoded)
-    autoencoder.compile(optimizer="adam", loss="mse")
+    autoencoder.compile(optimizer="adam", loss="mse", jit_compile=True)
     return autoencoder
 
 
@@ -35,30 +55,62 @@ def detect_anomalies_autoencoder(
     df: pd.DataFrame, feature_cols: List[str]
 ) -> pd.Series:
     """Fit an autoencoder and return anomaly scores."""
-    X = df[feature_cols].values
+    X = df[feature_cols].to_numpy(dtype=np.float32)
     model = build_autoencoder(X.shape[1])
     model.fit(X, X, epochs=20, batch_size=256, verbose=0)
-    recon = model.predict(X)
-    mse = ((X - recon) ** 2).mean(axis=1)
+    # Score in fixed-size chunks so only one chunk's reconstruction and
+    # residuals are held in memory at a time.
+    mse = np.empty(len(X), dtype=np.float32)
+    for start in range(0, len(X), SCORE_CHUNK_ROWS):
+        end = start + SCORE_CHUNK_ROWS
+        diff = X[start:end] - model(X[start:end], training=False).numpy()
+        mse[start:end] = np.einsum("ij,ij->i", diff, diff)
+    mse /= X.shape[1]
     return pd.Series(mse, index=df.index, name="autoencoder_mse")
 
 
+def pca_basis(
+    df: pd.DataFrame, feature_cols: List[str], n_components: int = 16
+) -> np.ndarray:
+    """Project features onto their leading principal components.
+
+    The projection can be shared by the distance- and split-based detectors
+    so they work in a small dense space instead of the full feature matrix.
+    """
+    n_components = min(n_components, len(feature_cols), len(df))
+    return PCA(n_components=n_components).fit_transform(df[feature_cols])
+
+
 def detect_anomalies_iforest(
-    df: pd.DataFrame, feature_cols: List[str]
+    df: pd.DataFrame,
+    feature_cols: List[str],
+    basis: Optional[np.ndarray] = None,
 ) -> pd.Series:
-    """Isolation Forest anomaly scores."""
+    """Isolation Forest anomaly scores.
+
+    If `basis` (see `pca_basis`) is given, the forest is fit on it instead
+    of the raw feature columns.
+    """
+    X = df[feature_cols] if basis is None else basis
     model = IsolationForest(contamination=0.01, random_state=42)
-    model.fit(df[feature_cols])
-    scores = -model.score_samples(df[feature_cols])
+    model.fit(X)
+    scores = -model.score_samples(X)
     return pd.Series(scores, index=df.index, name="iforest_score")
 
 
 def detect_anomalies_dbscan(
-    df: pd.DataFrame, feature_cols: List[str]
+    df: pd.DataFrame,
+    feature_cols: List[str],
+    basis: Optional[np.ndarray] = None,
 ) -> pd.Series:
-    """DBSCAN labels where -1 indicates anomalies."""
+    """DBSCAN labels where -1 indicates anomalies.
+
+    If `basis` (see `pca_basis`) is given, clustering runs on it instead of
+    the raw feature columns.
+    """
+    X = df[feature_cols] if basis is None else basis
     model = DBSCAN(eps=0.5, min_samples=5)
-    labels = model.fit_predict(df[feature_cols])
+    labels = model.fit_predict(X)
     return pd.Series(labels == -1, index=df.index, name="dbscan_anomaly")
 
 
@@ -67,30 +119,109 @@ def detect_anomalies_dbscan(
 # ---------------------------------------------------------------------------
 
 
+def _encode_target(y: pd.Series) -> Tuple[np.ndarray, int]:
+    """Sorted 0..k-1 class codes for the native CV APIs, and k."""
+    codes, classes = pd.factorize(y, sort=True)
+    return codes, len(classes)
+
+
 def train_xgboost(X: pd.DataFrame, y: pd.Series) -> xgb.XGBClassifier:
-    """Train an XGBoost classifier with simple hyperparameter tuning."""
-    params = {
-        "max_depth": [3, 5, 7],
-        "n_estimators": [100, 200],
-        "learning_rate": [0.05, 0.1],
-    }
-    clf = xgb.XGBClassifier(objective="binary:logistic", eval_metric="logloss")
-    grid = GridSearchCV(clf, params, cv=3, n_jobs=-1)
-    grid.fit(X, y)
-    return grid.best_estimator_
+    """Train an XGBoost classifier with simple hyperparameter tuning.
+
+    Each candidate is scored with native cross-validation on a single
+    DMatrix, and early stopping picks the number of boosting rounds.
+    Binary and multiclass targets are supported.
+    """
+    labels, n_classes = _encode_target(y)
+    if n_classes > 2:
+        objective, metric = "multi:softprob", "mlogloss"
+        extra = {"num_class": n_classes}
+    else:
+        objective, metric = "binary:logistic", "logloss"
+        extra = {}
+    dtrain = xgb.DMatrix(X, label=labels)
+    best = None
+    for max_depth, learning_rate in itertools.product([3, 5, 7], [0.05, 0.1]):
+        params = {
+            "objective": objective,
+            "eval_metric": metric,
+            "tree_method": "hist",
+            "max_depth": max_depth,
+            "learning_rate": learning_rate,
+            **extra,
+        }
+        history = xgb.cv(
+            params,
+            dtrain,
+            num_boost_round=500,
+            nfold=3,
+            early_stopping_rounds=20,
+            seed=42,
+        )
+        score = history[f"test-{metric}-mean"].iloc[-1]
+        if best is None or score < best[0]:
+            best = (score, max_depth, learning_rate, len(history))
+    _, max_depth, learning_rate, n_estimators = best
+    clf = xgb.XGBClassifier(
+        objective=objective,
+        eval_metric=metric,
+        tree_method="hist",
+        max_depth=max_depth,
+        learning_rate=learning_rate,
+        n_estimators=n_estimators,
+        n_jobs=-1,
+    )
+    clf.fit(X, y)
+    return clf
 
 
 def train_lightgbm(X: pd.DataFrame, y: pd.Series) -> lgb.LGBMClassifier:
-    """Train a LightGBM classifier with basic hyperparameter tuning."""
-    params = {
-        "num_leaves": [31, 63],
-        "n_estimators": [100, 200],
-        "learning_rate": [0.05, 0.1],
-    }
-    clf = lgb.LGBMClassifier()
-    grid = GridSearchCV(clf, params, cv=3, n_jobs=-1)
-    grid.fit(X, y)
-    return grid.best_estimator_
+    """Train a LightGBM classifier with basic hyperparameter tuning.
+
+    Candidates are scored with native cross-validation on a single Dataset,
+    and early stopping picks the number of boosting rounds. Binary and
+    multiclass targets are supported.
+    """
+    labels, n_classes = _encode_target(y)
+    if n_classes > 2:
+        objective, metric = "multiclass", "multi_logloss"
+        extra = {"num_class": n_classes}
+    else:
+        objective, metric = "binary", "binary_logloss"
+        extra = {}
+    dtrain = lgb.Dataset(X, label=labels)
+    best = None
+    for num_leaves, learning_rate in itertools.product([31, 63], [0.05, 0.1]):
+        params = {
+            "objective": objective,
+            "metric": metric,
+            "num_leaves": num_leaves,
+            "learning_rate": learning_rate,
+            "verbosity": -1,
+            **extra,
+        }
+        history = lgb.cv(
+            params,
+            dtrain,
+            num_boost_round=500,
+            nfold=3,
+            seed=42,
+            callbacks=[lgb.early_stopping(20, verbose=False)],
+        )
+        losses = history[f"valid {metric}-mean"]
+        if best is None or losses[-1] < best[0]:
+            best = (losses[-1], num_leaves, learning_rate, len(losses))
+    _, num_leaves, learning_rate, n_estimators = best
+    clf = lgb.LGBMClassifier(
+        objective=objective,
+        num_leaves=num_leaves,
+        learning_rate=learning_rate,
+        n_estimators=n_estimators,
+        n_jobs=-1,
+        verbosity=-1,
+    )
+    clf.fit(X, y)
+    return clf
 
 
 def train_catboost(X: pd.DataFrame, y: pd.Series) -> cb.CatBoostClassifier:
@@ -2,10 +2,51 @@
 
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+
+try:
+    import orjson  # noqa: F401
+except ImportError:  # pragma: no cover - fall back to the stdlib encoder
+    pass
+else:
+    pio.json.config.default_engine = "orjson"
+
+
+def geo_center(geo: gpd.GeoDataFrame) -> dict:
+    """Mean centroid of the geometries as a Plotly map center."""
+    centroids = geo.geometry.centroid
+    return {"lat": float(centroids.y.mean()), "lon": float(centroids.x.mean())}
+
+
+def align_to_geo(
+    df: pd.DataFrame, geo: gpd.GeoDataFrame, value_col: str, geo_key: str
+) -> np.ndarray:
+    """Values of `value_col` aligned row-for-row with `geo`.
+
+    Keys are matched with `Index.get_indexer` and geometries without data
+    get missing values. Unlike a merge, a key repeated in `df` (e.g. one
+    row per period) does not duplicate its geometry: numeric columns keep
+    the largest value for the key and other columns keep the first.
+    """
+    geo_keys = pd.Index(geo[geo_key])
+    if not pd.api.types.is_numeric_dtype(df[value_col]):
+        first = df.drop_duplicates(geo_key)
+        idx = pd.Index(first[geo_key]).get_indexer(geo_keys)
+        values = first[value_col].to_numpy(dtype=object, na_value=None)
+        # Unmatched keys (-1) pick up the trailing None.
+        return np.append(values, None)[idx]
+    unique_keys = geo_keys.unique()
+    idx = unique_keys.get_indexer(df[geo_key])
+    found = idx >= 0
+    values = df[value_col].to_numpy(dtype=float, na_value=np.nan)
+    aligned = np.full(len(unique_keys), np.nan)
+    np.fmax.at(aligned, idx[found], values[found])
+    return aligned[unique_keys.get_indexer(geo_keys)]
 
 
 def choropleth_heatmap(
@@ -14,22 +55,25 @@ def choropleth_heatmap(
     value_col: str,
     geo_key: str,
     output_html: Optional[str] = None,
+    center: Optional[dict] = None,
+    geojson: Optional[dict] = None,
 ) -> go.Figure:
-    """Create a Plotly choropleth heatmap by ZIP code or DMA."""
-    merged = geo.merge(
-        df[[geo_key, value_col]], left_on=geo_key, right_on=geo_key, how="left"
+    """Create a Plotly choropleth heatmap by ZIP code or DMA.
+
+    `center` (see `geo_center`) and `geojson` (``geo.__geo_interface__``)
+    may be precomputed by callers that draw the same geometries repeatedly.
+    """
+    merged = geo.assign(
+        **{value_col: align_to_geo(df, geo, value_col, geo_key)}
     )
     fig = px.choropleth_mapbox(
         merged,
-        geojson=merged.__geo_interface__,
+        geojson=merged.__geo_interface__ if geojson is None else geojson,
         locations=merged.index,
         color=value_col,
         mapbox_style="carto-positron",
         zoom=3,
-        center={
-            "lat": merged.geometry.centroid.y.mean(),
-            "lon": merged.geometry.centroid.x.mean(),
-        },
+        center=geo_center(merged) if center is None else center,
         opacity=0.6,
         hover_name=geo_key,
     )